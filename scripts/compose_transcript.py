@@ -1,11 +1,23 @@
 #!/usr/bin/env python3
-import json, os, re
+import datetime as dt, functools, io, os, re, sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from docx import Document
-from docx.shared import Pt
-from docx.oxml.ns import qn
+from zoneinfo import ZoneInfo
+
+try:
+    import re2 as regex_engine  # optional google-re2: linear-time DFA, same API for CITATION_RE
+except ImportError:
+    regex_engine = re
+
+try:
+    from orjson import loads as json_loads  # optional: parses the UTF-8 bytes directly
+except ImportError:
+    from json import loads as json_loads
 
 AUDIO_DIR = Path("audio")
+TEMPLATE_DOCX = Path(__file__).resolve().parent / "assets" / "template.docx"
+DENVER = ZoneInfo("America/Denver")
+MONTH_ABBR = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
 
 SECTION_HEADERS = [
     "Introduction:",
@@ -15,28 +27,92 @@ SECTION_HEADERS = [
     "Market Dynamics:",
     "Talent Market Shifts:"
 ]
+SECTION_HEADER_SET = frozenset(SECTION_HEADERS)
+
+HTML_TEXT_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+HTML_ATTR_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'})
+
+EMAIL_DIV_OPEN = b'<div style="font-family:-apple-system,BlinkMacSystemFont,\'Segoe UI\',Roboto,Arial,sans-serif;font-size:15px;line-height:1.6;">'
+EMAIL_DIV_CLOSE = b'</div>'
+EMAIL_HEADER_OPEN = b'<p style="margin:0 0 8px 0;"><strong>'
+EMAIL_HEADER_CLOSE = b'</strong></p>'
+EMAIL_P_OPEN = b'<p style="margin:0 0 18px 0;">'
+EMAIL_P_CLOSE = b'</p>'
+EMAIL_SOURCES_OPEN = (b'<hr style="border:none;border-top:1px solid #e5e7eb;margin:10px 0 12px;">'
+                      b'<p style="margin:0 0 6px 0;"><strong>Sources</strong></p>'
+                      b'<ul style="margin:0 0 18px 18px; padding:0;">')
+EMAIL_SOURCES_CLOSE = b'</ul>'
+EMAIL_LI_OPEN = b'<li style="margin:0 0 6px 0;">'
+EMAIL_LI_CLOSE = b'</li>'
+
+CITATION_RE = regex_engine.compile(r'\[(\d+(?:,\d+)*)\]')
+PARA_SPLIT_RE = re.compile(r'\n[ \t]*\n')  # blank line, tolerating stray indentation
+
+# Raw OOXML for the document body: every paragraph is emitted as text and the whole body
+# is parsed in one lxml call instead of building elements one python-docx call at a time
+W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+BODY_XML_OPEN = f'<w:body {W_NS}>'
+BODY_XML_CLOSE = '</w:body>'
+BOLD_RPR_XML = '<w:rPr><w:b/></w:rPr>'
+SUPERSCRIPT_RPR_XML = '<w:rPr><w:vertAlign w:val="superscript"/></w:rPr>'
+BODY_PPR_XML = '<w:pPr><w:pStyle w:val="BodyTx"/></w:pPr>'
+HEADER_PPR_XML = '<w:pPr><w:pStyle w:val="Hdr"/></w:pPr>'
+
+FONT_NAME = 'Calibri'
+FONT_SIZE_PT = 11
+FONT_SIZE_EMU = FONT_SIZE_PT * 12700  # python-docx lengths are EMU ints; Pt(11) without the call
+BODY_SPACE_AFTER_PT = 18
+HEADER_SPACE_AFTER_PT = 6
+LINE_SPACING = 1.2
+
+# The two paragraph styles the body references, as styles.xml markup (spacing in twentieths
+# of a point, line spacing in 240ths of a line) so they are appended rather than built via setters
+PARA_STYLES_XML = (
+    f'<w:styles {W_NS}>'
+    '<w:style w:type="paragraph" w:customStyle="1" w:styleId="BodyTx"><w:name w:val="BodyTx"/>'
+    '<w:basedOn w:val="Normal"/>'
+    f'<w:pPr><w:spacing w:after="{BODY_SPACE_AFTER_PT * 20}" w:line="{round(LINE_SPACING * 240)}" w:lineRule="auto"/></w:pPr>'
+    '</w:style>'
+    '<w:style w:type="paragraph" w:customStyle="1" w:styleId="Hdr"><w:name w:val="Hdr"/>'
+    '<w:basedOn w:val="BodyTx"/>'
+    f'<w:pPr><w:spacing w:after="{HEADER_SPACE_AFTER_PT * 20}"/></w:pPr><w:rPr><w:b/></w:rPr>'
+    '</w:style>'
+    '</w:styles>'
+)
 
 def denver_date_today():
-    import pytz, datetime as dt
-    return dt.datetime.now(pytz.timezone('America/Denver')).date()
+    return dt.datetime.now(DENVER).date()
 
 def short_date_for_subject(d):
-    return d.strftime("%d %b %y")
+    # Same as strftime("%d %b %y") but without the libc/locale round trip
+    return f"{d.day:02d} {MONTH_ABBR[d.month - 1]} {d.year % 100:02d}"
 
 def latest_json():
-    files = sorted(AUDIO_DIR.glob("ai_news_*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
-    return files[0] if files else None
+    """Newest audio/ai_news_*.json by mtime: one scandir pass, names filtered before any stat"""
+    try:
+        with os.scandir(AUDIO_DIR) as it:
+            newest = max((e for e in it if e.name.startswith("ai_news_") and e.name.endswith(".json")),
+                         key=lambda e: e.stat().st_mtime, default=None)
+    except FileNotFoundError:
+        return None
+    return Path(newest.path) if newest else None
 
-def parse_citations_for_html(text):
-    def add_spaces(match):
-        nums = match.group(1).replace(',', ', ')
-        return f'<sup>{nums}</sup>'
-    return re.sub(r'\[(\d+(?:,\d+)*)\]', add_spaces, text)
+def esc(text):
+    """Escape element text in one C-level translate pass; untouched input is returned as-is"""
+    if '&' in text or '<' in text or '>' in text:
+        return text.translate(HTML_TEXT_ESCAPE)
+    return text
 
-def parse_citations_for_docx(text):
+@functools.lru_cache(maxsize=None)
+def sup_html(nums):
+    """'1, 2' -> '<sup>1, 2</sup>', built once per distinct citation group"""
+    return f"<sup>{nums}</sup>"
+
+def parse_citations_re(text):
+    """Regex tokeniser behind parse_citations, used when a '[' isn't a clean citation"""
     parts = []
     last_end = 0
-    for match in re.finditer(r'\[(\d+(?:,\d+)*)\]', text):
+    for match in CITATION_RE.finditer(text):
         if match.start() > last_end:
             parts.append((text[last_end:match.start()], False))
         citation_text = match.group(1).replace(',', ', ')
@@ -46,159 +122,188 @@ def parse_citations_for_docx(text):
         parts.append((text[last_end:], False))
     return parts
 
+def parse_citations(text):
+    """Tokenise text into (text, is_citation) runs; citation runs hold the spaced ids ('1, 2')"""
+    if '[' not in text:
+        # No citation possible: skip the regex engine entirely
+        return [(text, False)] if text else []
+    # Common case: every '[' opens a well-formed [1] / [1,2] group, so str.find and slicing
+    # are enough; anything else goes to the regex
+    parts = []
+    last_end = 0
+    find = text.find
+    start = find('[')
+    while start != -1:
+        end = find(']', start + 1)
+        group = text[start + 1:end] if end != -1 else ''
+        if not (group and group[0] != ',' and group[-1] != ',' and ',,' not in group
+                and group.replace(',', '').isdecimal()):
+            return parse_citations_re(text)
+        if start > last_end:
+            parts.append((text[last_end:start], False))
+        parts.append((group.replace(',', ', '), True))
+        last_end = end + 1
+        start = find('[', last_end)
+    if last_end < len(text):
+        parts.append((text[last_end:], False))
+    return parts
+
 def split_on_header(para_text):
     """If paragraph starts with a header, split it into (header, content)"""
-    for header in SECTION_HEADERS:
-        if para_text.startswith(header):
-            content = para_text[len(header):].strip()
-            return header, content
+    # Every header ends at its first colon, so one slice + set lookup replaces the scan
+    header = para_text[:para_text.find(':') + 1]
+    if header in SECTION_HEADER_SET:
+        return header, para_text[len(header):].strip()
     return None, para_text
 
-def build_email_html(spoken, footnotes):
-    parts = []
-    parts.append('<div style="font-family:-apple-system,BlinkMacSystemFont,\'Segoe UI\',Roboto,Arial,sans-serif;font-size:15px;line-height:1.6;">')
-    
-    paragraphs = [p.strip() for p in spoken.split('\n\n') if p.strip()]
-    
-    for para in paragraphs:
-        if not para:
-            continue
-        
-        header, content = split_on_header(para)
-        
+def split_paragraphs(spoken):
+    """Split and tokenise the transcript once into (header, runs) blocks shared by both builders"""
+    paras = (para for p in PARA_SPLIT_RE.split(spoken) if (para := p.strip()))
+    return [(header, parse_citations(content)) for header, content in map(split_on_header, paras)]
+
+def normalize_footnotes(footnotes):
+    """Clean footnote dicts once into (id, title, url) tuples, dropping entries without a URL"""
+    return [(f.get("id", "?"), (f.get("title") or "").strip(), url)
+            for f in footnotes if (url := (f.get("url") or "").strip())]
+
+def build_email_html(blocks, footnotes):
+    """Assemble the email body as UTF-8 bytes; only escaped text needs encoding"""
+    buf = bytearray(EMAIL_DIV_OPEN)
+    for header, runs in blocks:
         if header:
             # Header found - output it bold on its own line
-            parts.append(f'<p style="margin:0 0 8px 0;"><strong>{header}</strong></p>')
-            if content:
-                # Content on next line
-                content_html = parse_citations_for_html(content)
-                parts.append(f'<p style="margin:0 0 18px 0;">{content_html}</p>')
-        else:
-            # No header - regular paragraph
-            para_html = parse_citations_for_html(para)
-            parts.append(f'<p style="margin:0 0 18px 0;">{para_html}</p>')
+            buf += EMAIL_HEADER_OPEN
+            buf += esc(header).encode("utf-8")
+            buf += EMAIL_HEADER_CLOSE
+        if runs:
+            buf += EMAIL_P_OPEN
+            buf += "".join(sup_html(text) if is_citation else esc(text) for text, is_citation in runs).encode("utf-8")
+            buf += EMAIL_P_CLOSE
     
     if footnotes:
-        parts.append('<hr style="border:none;border-top:1px solid #e5e7eb;margin:10px 0 12px;">')
-        parts.append('<p style="margin:0 0 6px 0;"><strong>Sources</strong></p>')
-        parts.append('<ul style="margin:0 0 18px 18px; padding:0;">')
-        for f in footnotes:
-            sid = f.get("id", "?")
-            title = (f.get("title") or "").strip()
-            url = (f.get("url") or "").strip()
-            if url:
-                if title:
-                    parts.append(f'<li style="margin:0 0 6px 0;">[{sid}] {title} — <a href="{url}">{url}</a></li>')
-                else:
-                    parts.append(f'<li style="margin:0 0 6px 0;">[{sid}] <a href="{url}">{url}</a></li>')
-        parts.append('</ul>')
-    
-    parts.append('</div>')
-    return ''.join(parts)
-
-def build_docx(docx_path, spoken, footnotes):
+        buf += EMAIL_SOURCES_OPEN
+        for sid, title, url in footnotes:
+            # Titles and URLs come straight from the feeds. Quotes are only escaped inside the
+            # href: send_email's plain-text fallback decodes just &lt; &gt; &amp;
+            href, text = url.translate(HTML_ATTR_ESCAPE), esc(url)
+            buf += EMAIL_LI_OPEN
+            if title:
+                buf += f'[{sid}] {esc(title)} — <a href="{href}">{text}</a>'.encode("utf-8")
+            else:
+                buf += f'[{sid}] <a href="{href}">{text}</a>'.encode("utf-8")
+            buf += EMAIL_LI_CLOSE
+        buf += EMAIL_SOURCES_CLOSE
+    
+    buf += EMAIL_DIV_CLOSE
+    return bytes(buf)
+
+def write_email_html(html_path, blocks, footnotes):
+    html_path.write_bytes(build_email_html(blocks, footnotes))
+
+def styled_document():
+    """Blank Document with the Calibri Normal style and the BodyTx/Hdr paragraph styles.
+    
+    scripts/assets/template.docx is this document saved once; regenerate it with
+    python -c "import compose_transcript as c; c.styled_document().save(c.TEMPLATE_DOCX)"
+    from scripts/ after changing the font or spacing constants.
+    """
+    from docx import Document
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import qn
+    
     doc = Document()
     base = doc.styles['Normal']
-    base.font.name = 'Calibri'
-    base._element.rPr.rFonts.set(qn('w:eastAsia'), 'Calibri')
-    base.font.size = Pt(11)
-    
-    def apply_pfmt(p):
-        pf = p.paragraph_format
-        pf.space_after = Pt(18)
-        pf.line_spacing = 1.2
-    
-    def apply_header_fmt(p):
-        pf = p.paragraph_format
-        pf.space_after = Pt(6)
-        pf.line_spacing = 1.2
-    
-    paragraphs = [p.strip() for p in spoken.split('\n\n') if p.strip()]
-    
-    for para_text in paragraphs:
-        if not para_text:
-            continue
-        
-        header, content = split_on_header(para_text)
-        
+    base.font.name = FONT_NAME
+    base._element.rPr.rFonts.set(qn('w:eastAsia'), FONT_NAME)
+    base.font.size = FONT_SIZE_EMU
+    # Spacing lives on two named styles; paragraphs just reference them by pStyle
+    doc.styles.element.extend(list(parse_xml(PARA_STYLES_XML)))
+    return doc
+
+def build_docx(docx_path, blocks, footnotes):
+    # python-docx (and lxml under it) is only imported when a document is actually built,
+    # so the no-JSON / empty-transcript exits never pay for it
+    from docx import Document
+    from docx.oxml import parse_xml
+    
+    def para_xml(ppr, runs):
+        """<w:p> markup from (text, rPr markup) runs; element text only needs &<> escaped"""
+        return "".join((f'<w:p>{ppr}',
+                        *(f'<w:r>{rpr}<w:t xml:space="preserve">{esc(text)}</w:t></w:r>' for text, rpr in runs),
+                        '</w:p>'))
+    
+    doc = Document(TEMPLATE_DOCX) if TEMPLATE_DOCX.is_file() else styled_document()
+    
+    parts = [BODY_XML_OPEN]
+    for header, runs in blocks:
         if header:
-            # Create bold header paragraph with 6pt spacing
-            p_header = doc.add_paragraph()
-            r = p_header.add_run(header)
-            r.bold = True
-            apply_header_fmt(p_header)
-            
-            if content:
-                # Create normal content paragraph with 18pt spacing
-                p_content = doc.add_paragraph()
-                parts = parse_citations_for_docx(content)
-                for text, is_citation in parts:
-                    r = p_content.add_run(text)
-                    if is_citation:
-                        r.font.superscript = True
-                apply_pfmt(p_content)
-        else:
-            # Regular paragraph - 18pt spacing
-            p = doc.add_paragraph()
-            parts = parse_citations_for_docx(para_text)
-            for text, is_citation in parts:
-                r = p.add_run(text)
-                if is_citation:
-                    r.font.superscript = True
-            apply_pfmt(p)
+            parts.append(para_xml(HEADER_PPR_XML, [(header, '')]))
+        if runs:
+            parts.append(para_xml(BODY_PPR_XML, [(text, SUPERSCRIPT_RPR_XML if is_citation else '') for text, is_citation in runs]))
     
     if footnotes:
-        p = doc.add_paragraph()
-        r = p.add_run("Sources")
-        r.bold = True
-        apply_pfmt(p)
-        
-        for f in footnotes:
-            sid = f.get("id", "?")
-            title = (f.get("title") or "").strip()
-            url = (f.get("url") or "").strip()
-            if url:
-                line = f"[{sid}] {title} — {url}" if title else f"[{sid}] {url}"
-                p = doc.add_paragraph(line)
-                apply_pfmt(p)
-    
-    doc.save(docx_path)
+        parts.append(para_xml(BODY_PPR_XML, [("Sources", BOLD_RPR_XML)]))
+        for sid, title, url in footnotes:
+            line = f"[{sid}] {title} — {url}" if title else f"[{sid}] {url}"
+            parts.append(para_xml(BODY_PPR_XML, [(line, '')]))
+    parts.append(BODY_XML_CLOSE)
+    
+    # One parse for the whole body, one bulk extend, then move the section properties
+    # back to the end where OOXML requires them
+    body = doc.element.body
+    sect_pr = body.sectPr
+    body.extend(list(parse_xml("".join(parts))))
+    if sect_pr is not None:
+        body.append(sect_pr)
+    
+    # zipfile issues many small writes; collect them in memory and hit the disk once
+    out = io.BytesIO()
+    doc.save(out)
+    docx_path.write_bytes(out.getvalue())
 
 def main():
     jpath = latest_json()
     if not jpath:
         raise SystemExit("No JSON transcript found in audio/")
     
-    data = json.loads(jpath.read_text(encoding="utf-8"))
+    data = json_loads(jpath.read_bytes())
     spoken = data.get("spoken", "").strip()
-    footnotes = data.get("footnotes", [])
+    footnotes = normalize_footnotes(data.get("footnotes") or ())
     
     if not spoken:
         raise SystemExit("Empty transcript in JSON")
     
-    today = denver_date_today()
-    subject = f"AI Exec Brief (transcript) - {short_date_for_subject(today)}"
-    out_base = f"AI Exec Brief (transcript) - {short_date_for_subject(today)}"
+    # The subject line doubles as the output file stem
+    subject = out_base = f"AI Exec Brief (transcript) - {short_date_for_subject(denver_date_today())}"
     
     html_path = AUDIO_DIR / (out_base + ".html")
     docx_path = AUDIO_DIR / (out_base + ".docx")
     
-    html = build_email_html(spoken, footnotes)
-    html_path.write_text(html, encoding="utf-8")
-    build_docx(docx_path, spoken, footnotes)
+    blocks = split_paragraphs(spoken)
+    # Independent outputs: the HTML build/write overlaps the DOCX parse/zip (lxml, zlib and
+    # file I/O release the GIL)
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        docx_job = ex.submit(build_docx, docx_path, blocks, footnotes)
+        html_job = ex.submit(write_email_html, html_path, blocks, footnotes)
+        html_job.result()
+        docx_job.result()
     
     lines = [
         f"HTML_BODY={html_path}",
         f"DOCX_PATH={docx_path}",
         f"SUBJECT_LINE={subject}",
     ]
-    print("\n".join(lines))
+    out = "\n".join(lines) + "\n"
+    sys.stdout.write(out)
     
     gh_out = os.environ.get("GITHUB_OUTPUT")
     if gh_out:
-        with open(gh_out, "a", encoding="utf-8") as fh:
-            for line in lines:
-                fh.write(line + "\n")
+        # One O_APPEND write of the encoded block, no TextIOWrapper
+        fd = os.open(gh_out, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, out.encode("utf-8"))
+        finally:
+            os.close(fd)
 
 if __name__ == "__main__":
     main()
@@ -1,13 +1,59 @@
 #!/usr/bin/env python3
-import os, sys, json, datetime as dt, requests, feedparser, re
+import os, sys, json, datetime as dt, functools, hashlib, itertools, requests, feedparser, re, shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from openai import OpenAI
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from zoneinfo import ZoneInfo
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # optional: serialises straight to UTF-8 bytes in C
+except ImportError:
+    orjson = None
+
+# Only entry titles and links are read, so skip building/sanitizing everything else
+try:
+    import fastfeedparser  # optional: lxml-backed, only builds the fields it finds
+    parse_feed = functools.partial(fastfeedparser.parse, include_content=False, include_tags=False,
+                                   include_media=False, include_enclosures=False)
+except ImportError:
+    parse_feed = functools.partial(feedparser.parse, sanitize_html=False, resolve_relative_uris=False)
 
 AUDIO_DIR = Path("audio")
+TTS_CACHE_DIR = Path(".cache/tts")  # outside audio/, which the workflow commits wholesale
+FEED_CACHE_PATH = Path(".cache/feeds.json")  # ETag/Last-Modified + parsed items per feed
+LLM_CACHE_DIR = Path(".cache/llm")  # finished completions keyed by request hash
+TTS_WORKERS = 3  # concurrent ElevenLabs requests; stays under the lowest paid-tier limit
+DENVER = ZoneInfo("America/Denver")
 MODEL_TEXT = "gpt-4o-mini"
 MODEL_TTS = "eleven_multilingual_v2"
+TTS_FORMAT = "mp3_44100_128"  # pinned so segments always concatenate into one consistent MP3
+TTS_TIMEOUT = (10, 60)  # connect, then max gap between streamed chunks (not the whole download)
+TARGET_MIN = 5  # upper end of the "4-5 minute" brief the prompt asks for
+# ~160 spoken words/min at ~1.6 tokens/word (citations and headers included), plus slack so
+# the sign-off is never cut; a tight cap bounds the time to the last token
+MAX_TOKENS = int(TARGET_MIN * 160 * 1.6) + 384
 STABILITY, SIMILARITY, STYLE, SPEAKER_BOOST = 0.3, 0.8, 0.1, True
 
+# TTS segment boundary in the streamed completion: a blank line, tolerating stray indentation.
+# Shorter stretches are held back and merged into the next segment rather than sent alone.
+PARA_BREAK_RE = re.compile(r'\n[ \t]*\n')
+MIN_SEGMENT_CHARS = 10
+
+CITATION_RE = re.compile(r'\[(\d+(?:,\s*\d+)*)\]')  # as the model writes them: [1], [2, 3]
+EMPHASIS_RE = re.compile(r'\*{1,3}([^*]+)\*{1,3}')  # *italic*, **bold**, ***both*** in one scan
+
+SECTION_HEADERS = (
+    "Introduction:",
+    "New Products & Capabilities:",
+    "Strategic Business Impact:",
+    "Implementation Opportunities:",
+    "Market Dynamics:",
+    "Talent Market Shifts:",
+)
+HEADER_RE = re.compile('|'.join(map(re.escape, SECTION_HEADERS)))
+
 SOURCES = [
     "https://www.theverge.com/rss/index.xml",
     "https://feeds.feedburner.com/TechCrunch/artificial-intelligence",
@@ -17,61 +63,192 @@ SOURCES = [
     "https://news.ycombinator.com/rss",
 ]
 
+# One pooled keep-alive session for the feed GETs and the ElevenLabs POSTs. POST is retried
+# too, but only on connection failures and 429/5xx: no audio was delivered, and with several
+# TTS segments in flight a transient rate limit shouldn't sink the run. read=False: a read
+# error means ElevenLabs may already be synthesizing (and billing) the paragraph, so it is
+# never resent. The last failed response is returned (not raised) so elevenlabs_tts can
+# still report it.
+SESSION = requests.Session()
+SESSION.headers["User-Agent"] = feedparser.USER_AGENT
+SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=8,
+                                      max_retries=Retry(total=3, read=False, backoff_factor=0.5,
+                                                        status_forcelist=[429, 500, 502, 503, 504],
+                                                        allowed_methods=frozenset({"GET", "POST"}),
+                                                        raise_on_status=False)))
+
+@functools.lru_cache(maxsize=1)
 def denver_date_today():
-    import pytz
-    return dt.datetime.now(pytz.timezone("America/Denver")).date()
+    # One date per run: the intro line and the output file names can't straddle midnight
+    return dt.datetime.now(DENVER).date()
 
+@functools.lru_cache(maxsize=1)
 def intro_date_str():
     d = denver_date_today()
-    return f"{d.strftime('%A')}, {d.strftime('%B')} {d.day}, {d.strftime('%Y')}"
+    return f"{d:%A, %B} {d.day}, {d.year}"
 
-def fetch_headlines(limit=15):
+def load_feed_cache():
+    try:
+        return json.loads(FEED_CACHE_PATH.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+def request_feed(url, cached=None):
+    """Conditional GET for one feed; None if the request failed"""
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    try:
+        return SESSION.get(url, headers=headers, timeout=10)
+    except Exception:
+        return None
+
+def feed_items(body, per_feed=5):
+    try:
+        feed = parse_feed(body)
+    except Exception:
+        return []
     items = []
-    for url in SOURCES:
-        try:
-            feed = feedparser.parse(url)
-            for e in feed.entries[:5]:
-                title = getattr(e, "title", "").strip()
-                link = getattr(e, "link", "").strip()
-                if title and link:
-                    items.append({"title": title, "url": link})
-        except: pass
-        if len(items) >= limit: break
-    return items[:limit]
+    # Plain .get works on both parsers' entry dicts
+    for e in feed.get("entries", [])[:per_feed]:
+        title = (e.get("title") or "").strip()
+        link = (e.get("link") or "").strip()
+        if not link:
+            # Some Atom entries only carry a permalink id; tag: URIs aren't linkable
+            link = (e.get("id") or "").strip()
+            if not link.startswith(("http://", "https://")):
+                link = ""
+        if title and link:
+            items.append({"title": title, "url": link})
+    return items
 
-def renumber_citations(text, sources_map):
-    citation_pattern = r'\[(\d+(?:,\s*\d+)*)\]'
-    citations_found = []
-    
-    for match in re.finditer(citation_pattern, text):
-        nums = [int(n.strip()) for n in match.group(1).split(',')]
-        for num in nums:
-            if num not in citations_found and num in sources_map:
-                citations_found.append(num)
+def dedupe_headlines(items):
+    """Drop repeats of a story already seen in an earlier feed (same URL or same title)"""
+    seen_urls, seen_titles, unique = set(), set(), []
+    for h in items:
+        u = urlsplit(h["url"])
+        # Scheme, www., trailing slash, fragment and utm_* tracking params don't change the story;
+        # the rest of the query does (e.g. news.ycombinator.com/item?id=...)
+        query = urlencode([kv for kv in parse_qsl(u.query) if not kv[0].startswith("utm_")])
+        url_key = (u.netloc.lower().removeprefix("www."), u.path.rstrip("/"), query)
+        title_key = " ".join(h["title"].casefold().split())
+        if url_key in seen_urls or title_key in seen_titles:
+            continue
+        seen_urls.add(url_key)
+        seen_titles.add(title_key)
+        unique.append(h)
+    return unique
+
+def fetch_headlines(limit=15):
+    cache = load_feed_cache()
+    # Retrieval is network-bound, so all feeds download at once; ex.map keeps SOURCES order
+    with ThreadPoolExecutor(max_workers=len(SOURCES)) as ex:
+        responses = list(ex.map(lambda url: request_feed(url, cache.get(url)), SOURCES))
     
-    renumber_map = {old_id: idx + 1 for idx, old_id in enumerate(citations_found)}
+    # Parsing is CPU/memory-bound, so it runs one feed at a time: only one parsed tree is alive
+    items, new_cache = [], {}
+    for url, r in zip(SOURCES, responses):
+        cached = cache.get(url)
+        found = None
+        if len(items) >= limit or r is None or r.status_code >= 400:
+            # Quota already filled by earlier feeds (skip the parse), or the request failed
+            # (including retries exhausted): no headlines, keep the old validators
+            entry = cached
+        elif r.status_code == 304 and cached:
+            # Unchanged since the cached fetch: no body, nothing to parse
+            found = cached["items"]
+            entry = cached
+        else:
+            found = feed_items(r.content)
+            etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+            entry = None
+            if r.status_code == 200 and (etag or last_modified):
+                entry = {"etag": etag, "last_modified": last_modified, "items": found}
+        if entry:
+            new_cache[url] = entry
+        if found:
+            # Dedupe as we go, so the quota check above counts distinct stories
+            items = dedupe_headlines(items + found)
     
-    def replace_citation(match):
-        old_nums = [int(n.strip()) for n in match.group(1).split(',')]
-        new_nums = sorted(set(renumber_map.get(n) for n in old_nums if n in renumber_map))
-        if not new_nums:
-            return ''
-        return f"[{','.join(str(n) for n in new_nums)}]"
+    try:
+        FEED_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename, so an interrupted run never leaves a truncated cache behind
+        tmp = FEED_CACHE_PATH.with_name(FEED_CACHE_PATH.name + ".tmp")
+        tmp.write_bytes(json_bytes(new_cache))
+        os.replace(tmp, FEED_CACHE_PATH)
+    except OSError:
+        pass  # the cache only saves bandwidth; never fail the run over it
+    return items[:limit]
+
+def renumber_citations(text, sources_map):
+    """One walk over the citations -> (cited text, text without citations, cited sources).
+    Ids are renumbered 1..n in order of first citation; ids with no source are dropped."""
+    renumber_map = {}
+    cited, uncited = [], []
+    last_end = 0
+    for match in CITATION_RE.finditer(text):
+        plain = text[last_end:match.start()]
+        cited.append(plain)
+        uncited.append(plain)
+        last_end = match.end()
+        # int() already ignores surrounding whitespace, and the pattern guarantees digits
+        new_nums = sorted({renumber_map.setdefault(n, len(renumber_map) + 1)
+                           for n in map(int, match.group(1).split(',')) if n in sources_map})
+        if new_nums:
+            cited.append(f"[{','.join(map(str, new_nums))}]")
+    tail = text[last_end:]
+    cited.append(tail)
+    uncited.append(tail)
     
-    cleaned_text = re.sub(citation_pattern, replace_citation, text)
+    renumbered_sources = [{**sources_map[old_id], 'id': new_id} for old_id, new_id in renumber_map.items()]
+    return "".join(cited), "".join(uncited), renumbered_sources
+
+def spoken_text(paragraph):
+    """Audio form of one transcript paragraph: no markdown, citations or section headers"""
+    text = EMPHASIS_RE.sub(r'\1', paragraph)
+    text = CITATION_RE.sub('', text)
+    return HEADER_RE.sub('', text).strip()
+
+def completion_deltas(client, prompt):
+    """Yield the completion text as it streams; an identical earlier request is replayed from
+    the cache (same day, same headlines -> same prompt) instead of being generated again"""
+    request = {
+        "model": MODEL_TEXT,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.5,
+        "max_tokens": MAX_TOKENS,
+    }
+    key = json.dumps(request, sort_keys=True).encode("utf-8")
+    cached = LLM_CACHE_DIR / f"{hashlib.sha256(key).hexdigest()}.txt"
+    if cached.is_file():
+        print("Reusing cached completion")
+        yield cached.read_text(encoding="utf-8")
+        return
     
-    renumbered_sources = []
-    for old_id in citations_found:
-        if old_id in sources_map:
-            src = sources_map[old_id].copy()
-            src['id'] = renumber_map[old_id]
-            renumbered_sources.append(src)
+    deltas = []
+    finish_reason = None
+    for chunk in client.chat.completions.create(**request, stream=True):
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        finish_reason = choice.finish_reason or finish_reason
+        if choice.delta.content:
+            deltas.append(choice.delta.content)
+            yield choice.delta.content
     
-    return cleaned_text, renumbered_sources
+    # Only a complete answer is worth replaying; a length-capped one should be regenerated
+    if finish_reason == "stop":
+        LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_suffix(".tmp")
+        tmp.write_text("".join(deltas), encoding="utf-8")
+        os.replace(tmp, cached)
 
-def openai_narrative_brief(api_key, headlines):
-    client = OpenAI(api_key=api_key)
-    
+def openai_narrative_brief(client, headlines, on_paragraph=None):
+    """Generate the brief; with on_paragraph, each finished paragraph's spoken text is handed
+    over while the completion is still streaming, so TTS can start before the model is done"""
     headlines_text = "\n".join([f"[{i+1}] {h['title']} - {h['url']}" for i, h in enumerate(headlines)])
     
     narrative_prompt = f"""Write a 4-5 minute executive AI briefing with clear section headers.
@@ -114,33 +291,46 @@ Sources:
 
 Write flowing narrative with frequent citations. NO MARKDOWN FORMATTING."""
 
-    resp1 = client.chat.completions.create(
-        model=MODEL_TEXT,
-        messages=[{"role": "user", "content": narrative_prompt}],
-        temperature=0.5,
-        max_tokens=1800,
-    )
+    def emit(paragraph):
+        spoken = spoken_text(paragraph)
+        if spoken:
+            on_paragraph(spoken)
+    
+    deltas = []
+    pending = ""
+    scan_from = 0
+    for delta in completion_deltas(client, narrative_prompt):
+        deltas.append(delta)
+        if on_paragraph:
+            # Paragraphs (and headers) are separated by blank lines in the prompt's format
+            pending += delta
+            while m := PARA_BREAK_RE.search(pending, scan_from):
+                if m.start() < MIN_SEGMENT_CHARS:
+                    scan_from = m.end()
+                    continue
+                emit(pending[:m.start()])
+                pending = pending[m.end():]
+                scan_from = 0
+    if on_paragraph:
+        emit(pending)
     
-    transcript_raw = resp1.choices[0].message.content.strip()
+    transcript_raw = "".join(deltas).strip()
     
     # Remove any markdown formatting that OpenAI might add
-    transcript_raw = re.sub(r'\*\*([^*]+)\*\*', r'\1', transcript_raw)
-    transcript_raw = re.sub(r'\*([^*]+)\*', r'\1', transcript_raw)
+    transcript_raw = EMPHASIS_RE.sub(r'\1', transcript_raw)
     
     sources_map = {i+1: {"id": i+1, "title": h["title"], "url": h["url"]} for i, h in enumerate(headlines)}
-    transcript_cited, sources_used = renumber_citations(transcript_raw, sources_map)
-    transcript_audio = re.sub(r'\[\d+(?:,\d+)*\]', '', transcript_cited)
+    transcript_cited, transcript_audio, sources_used = renumber_citations(transcript_raw, sources_map)
     
     # Remove section headers from audio
-    audio_clean = transcript_audio
-    for header in ["Introduction:", "New Products & Capabilities:", "Strategic Business Impact:", 
-                   "Implementation Opportunities:", "Market Dynamics:", "Talent Market Shifts:"]:
-        audio_clean = audio_clean.replace(header, "")
+    audio_clean = HEADER_RE.sub('', transcript_audio)
     
     return transcript_cited, audio_clean, sources_used
 
-def elevenlabs_tts(api_key, voice_id, text, out_mp3):
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+def elevenlabs_tts(api_key, voice_id, text, previous_text=None):
+    """Synthesize text into its cache file and return that path"""
+    url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream"
+    params = {"output_format": TTS_FORMAT}
     payload = {
         "model_id": MODEL_TTS,
         "text": text,
@@ -151,51 +341,130 @@ def elevenlabs_tts(api_key, voice_id, text, out_mp3):
             "use_speaker_boost": SPEAKER_BOOST
         }
     }
+    if previous_text:
+        # Lets the voice carry intonation across the paragraph boundary
+        payload["previous_text"] = previous_text
     headers = {
         "xi-api-key": api_key,
         "accept": "audio/mpeg",
         "content-type": "application/json"
     }
     
+    # Same text, voice, settings and context -> same audio, so a re-run reuses the segment
+    # instead of spending ElevenLabs time and quota on it again
+    key = json.dumps([voice_id, params, payload], sort_keys=True).encode("utf-8")
+    cached = TTS_CACHE_DIR / f"{hashlib.sha256(key).hexdigest()}.mp3"
+    if cached.is_file():
+        print(f"Reusing cached audio (text: {len(text)} chars)")
+        return cached
+    
     print(f"Calling ElevenLabs (text: {len(text)} chars)...")
-    r = requests.post(url, headers=headers, json=payload, timeout=180)
+    TTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    partial = cached.with_suffix(".part")
+    # Streamed: audio chunks hit the disk as ElevenLabs synthesizes them instead of
+    # arriving as one body after the whole paragraph is rendered
+    with SESSION.post(url, params=params, headers=headers, json=payload, stream=True,
+                      timeout=TTS_TIMEOUT) as r:
+        if r.status_code != 200:
+            print(f"ERROR: ElevenLabs {r.status_code}: {r.text[:500]}", file=sys.stderr)
+            sys.exit(1)
+        
+        with partial.open("wb") as f:
+            for chunk in r.iter_content(chunk_size=65536):
+                if chunk:
+                    f.write(chunk)
+    # Only a complete download becomes a cache entry
+    os.replace(partial, cached)
+    return cached
+
+def json_bytes(obj):
+    # The transcript JSON is machine-read, so it is compact unless PRETTY_JSON is set
+    pretty = bool(os.getenv("PRETTY_JSON"))
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    # Same bytes orjson would produce, non-ASCII left as UTF-8
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def write_transcript(json_path, txt_path, transcript_cited, sources):
+    json_path.write_bytes(json_bytes({"spoken": transcript_cited, "footnotes": sources}))
     
-    if r.status_code != 200:
-        print(f"ERROR: ElevenLabs {r.status_code}: {r.text[:500]}", file=sys.stderr)
-        sys.exit(1)
+    def source_line(s):
+        sid, title, url = s.get("id", "?"), (s.get("title") or "").strip(), (s.get("url") or "").strip()
+        if url:
+            return f"[{sid}] {title} --- {url}" if title else f"[{sid}] {url}"
+        return None
     
-    out_mp3.write_bytes(r.content)
-    print(f"✓ Audio: {out_mp3.name} ({len(r.content)/(1024*1024):.2f} MB)")
+    source_lines = (line for line in map(source_line, sources) if line)
+    text = "\n".join(itertools.chain((transcript_cited, "", "---", "", "Sources:"), source_lines))
+    # One encode of the finished text and one write, as for the JSON
+    txt_path.write_bytes(text.encode("utf-8"))
 
 def main():
     api_key = os.getenv("OPENAI_API_KEY", "").strip()
     el_key = os.getenv("ELEVENLABS_API_KEY", "").strip()
     voice_id = os.getenv("ELEVENLABS_VOICE_ID", "").strip()
     
-    if not all([api_key, el_key, voice_id]):
+    if not (api_key and el_key and voice_id):
         print("ERROR: Missing API keys", file=sys.stderr)
         sys.exit(1)
     
     print("Fetching headlines...")
-    headlines = fetch_headlines()
+    # The feed fetches run in the background while the (heavy) openai import and client
+    # setup happen here, so only the slower of the two is on the critical path
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        headlines_job = ex.submit(fetch_headlines)
+        from openai import OpenAI
+        client = OpenAI(api_key=api_key)
+        headlines = headlines_job.result()
     print(f"✓ {len(headlines)} headlines")
     
+    AUDIO_DIR.mkdir(exist_ok=True)
+    base = f"ai_news_{denver_date_today().strftime('%Y%m%d')}"
+    mp3_path = AUDIO_DIR / f"{base}.mp3"
+    json_path = AUDIO_DIR / f"{base}.json"
+    txt_path = AUDIO_DIR / f"{base}.txt"
+    
     print("Generating brief...")
-    transcript_cited, transcript_audio, sources = openai_narrative_brief(api_key, headlines)
+    # Paragraphs go to ElevenLabs as the completion streams in, a few at a time. Segments
+    # finish out of order, so they are stitched together in submission order afterwards;
+    # MP3 frames concatenate into one playable file.
+    with ThreadPoolExecutor(max_workers=TTS_WORKERS) as tts:
+        tts_jobs = []
+        spoken = []
+        
+        def synthesize(text):
+            previous = spoken[-1] if spoken else None
+            spoken.append(text)
+            tts_jobs.append(tts.submit(elevenlabs_tts, el_key, voice_id, text, previous))
+        
+        transcript_cited, transcript_audio, sources = openai_narrative_brief(client, headlines, on_paragraph=synthesize)
+        if transcript_audio:
+            # The transcript is final once the completion ends: persist it while the last
+            # segments are still synthesizing, so it is on disk even if TTS then fails
+            write_transcript(json_path, txt_path, transcript_cited, sources)
+        # Assembled under a temporary name: a failed segment must not leave a truncated
+        # MP3 where update_feed would pick it up
+        partial = mp3_path.with_suffix(".part")
+        try:
+            with partial.open("wb") as mp3:
+                for job in tts_jobs:
+                    # Copied through a fixed buffer: no segment is ever held in memory whole
+                    with job.result().open("rb") as segment:
+                        shutil.copyfileobj(segment, mp3, 64 * 1024)
+        except BaseException:  # including the SystemExit elevenlabs_tts raises on an API error
+            partial.unlink(missing_ok=True)
+            raise
     
     if not transcript_audio:
+        partial.unlink(missing_ok=True)
         print("ERROR: Empty transcript", file=sys.stderr)
         sys.exit(1)
+    os.replace(partial, mp3_path)
     
     print(f"✓ Transcript: {len(transcript_audio)} chars, {len(sources)} sources cited")
-    
-    AUDIO_DIR.mkdir(exist_ok=True)
-    base = f"ai_news_{denver_date_today().strftime('%Y%m%d')}"
-    mp3_path = AUDIO_DIR / f"{base}.mp3"
-    json_path = AUDIO_DIR / f"{base}.json"
-    txt_path = AUDIO_DIR / f"{base}.txt"
-    
-    elevenlabs_tts(el_key, voice_id, transcript_audio, mp3_path)
+    print(f"✓ Audio: {mp3_path.name} ({len(tts_jobs)} segments)")
     
     if not mp3_path.exists() or mp3_path.stat().st_size == 0:
         print(f"ERROR: MP3 not created or empty", file=sys.stderr)
@@ -203,15 +472,6 @@ def main():
     
     print(f"✓ MP3 verified: {mp3_path.stat().st_size / (1024*1024):.2f} MB")
     
-    json_path.write_text(json.dumps({"spoken": transcript_cited, "footnotes": sources}, indent=2), encoding="utf-8")
-    
-    lines = [transcript_cited, "", "---", "", "Sources:"]
-    for s in sources:
-        sid, title, url = s.get("id", "?"), (s.get("title") or "").strip(), (s.get("url") or "").strip()
-        if url:
-            lines.append(f"\n[{sid}] {title} --- {url}" if title else f"\n[{sid}] {url}")
-    txt_path.write_text("\n".join(lines), encoding="utf-8")
-    
     print(f"✓ Complete: {mp3_path.name}, {json_path.name}, {txt_path.name}")
 
 if __name__ == "__main__":
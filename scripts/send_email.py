@@ -11,19 +11,25 @@ from email.headerregistry import Address
 from email.message import EmailMessage
 
 def get_env(name: str, default: str = "") -> str:
-    v = os.getenv(name, default)
-    return v.strip() if isinstance(v, str) else v
+    # os.getenv with a str default always returns str
+    return os.getenv(name, default).strip()
 
 def coerce_port(val: str, fallback: int = 587) -> int:
     try:
-        return int(str(val).strip())
+        return int(val)  # int() already ignores surrounding whitespace
     except Exception:
         return fallback
 
 def build_body() -> str:
-    """Prefer BODY; fall back to BODY_B64 (base64-encoded UTF-8 transcript)."""
+    """Prefer BODY, then BODY_PATH (UTF-8 HTML file), then BODY_B64 (base64-encoded UTF-8 transcript)."""
     body = get_env("BODY", "")
+    body_path = get_env("BODY_PATH", "")
     b64 = get_env("BODY_B64", "")
+    if not body and body_path:
+        try:
+            body = Path(body_path).read_bytes().decode("utf-8", errors="ignore")
+        except OSError:
+            body = "(Failed to read transcript body.)"
     if not body and b64:
         try:
             body = base64.b64decode(b64).decode("utf-8", errors="ignore")
@@ -87,7 +93,8 @@ def main() -> int:
     plain_body = (plain_body
                   .replace("<br>", "\n").replace("<br/>", "\n").replace("<br />", "\n")
                   .replace("</p>", "\n\n").replace("<p>", "").replace("</p>", "")
-                  .replace("&nbsp;", " "))
+                  .replace("&nbsp;", " ")
+                  .replace("&lt;", "<").replace("&gt;", ">").replace("&amp;", "&"))
 
     msg.set_content(plain_body, charset="utf-8")
     msg.add_alternative(html_body, subtype="html", charset="utf-8")
@@ -1,18 +1,29 @@
 #!/usr/bin/env python3
-import os, sys, time, datetime, re
+import os, sys, time, datetime
 import xml.etree.ElementTree as ET
 from pathlib import Path
+from zoneinfo import ZoneInfo
 
 BASE_URL = os.environ.get("PAGE_BASE_URL", "https://kyledeguire.github.io/ai-news-audio-feed")
 FEED_PATH = Path("feed.xml")
 AUDIO_DIR = Path("audio")
+DENVER = ZoneInfo("America/Denver")
 
 def rfc2822_now_gmt():
     return datetime.datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT")
 
 def denver_date_today():
-    import pytz
-    return datetime.datetime.now(pytz.timezone('America/Denver')).date()
+    return datetime.datetime.now(DENVER).date()
+
+def newest_mp3():
+    """Newest audio/ai_news_*.mp3 by mtime, from a single scandir pass"""
+    try:
+        with os.scandir(AUDIO_DIR) as it:
+            best = max((e for e in it if e.name.startswith("ai_news_") and e.name.endswith(".mp3")),
+                       key=lambda e: e.stat().st_mtime, default=None)
+    except FileNotFoundError:
+        return None
+    return Path(best.path) if best else None
 
 def load_stamp():
     today = denver_date_today().strftime("%Y%m%d")
@@ -21,12 +32,13 @@ def load_stamp():
         print(f"Found today's MP3: {today_mp3.name}")
         return today
     
-    mp3s = sorted(AUDIO_DIR.glob("ai_news_*.mp3"), key=lambda p: p.stat().st_mtime, reverse=True)
-    if mp3s:
-        m = re.search(r"(\d{8})$", mp3s[0].stem)
-        if m:
-            print(f"Found newest MP3: {mp3s[0].name}")
-            return m.group(1)
+    newest = newest_mp3()
+    if newest:
+        # ai_news_YYYYMMDD: the stamp is a fixed-width suffix, no regex needed
+        stamp = newest.stem[-8:]
+        if len(stamp) == 8 and stamp.isascii() and stamp.isdigit():
+            print(f"Found newest MP3: {newest.name}")
+            return stamp
     
     print("No MP3 files found", file=sys.stderr)
     return None
@@ -50,8 +62,7 @@ def find_latest_mp3_by_stamp(stamp):
         if mp3_path.exists():
             return mp3_path
     
-    mp3s = sorted(AUDIO_DIR.glob("ai_news_*.mp3"), key=lambda p: p.stat().st_mtime, reverse=True)
-    return mp3s[0] if mp3s else None
+    return newest_mp3()
 
 def ensure_feed_exists():
     if not FEED_PATH.exists():